@@ -1,7 +1,25 @@
+import random
+import threading
+import time
+
 import gradio as gr
 from utils.bgg import get_game_details, get_hot_games, get_similar_games_v2, search
 
 
+def _refresh_hot():
+    """Keep the hot-games TTL cache warm so no visitor pays the BGG round-trip."""
+    while True:
+        try:
+            # Force a real fetch: the plain call is read-through and would
+            # just return the still-valid entry when we wake before the TTL.
+            get_hot_games.refresh()
+        except Exception as e:
+            print(f"Error refreshing hot games: {e}")
+        # Sleep just under the cache's 1h TTL, with jitter so restarts don't
+        # sync every instance onto the same refresh tick.
+        time.sleep(3600 - random.uniform(60, 300))
+
+
 search_bgg = gr.Interface(
     fn=search,
     inputs=["text"],
@@ -34,6 +52,8 @@ recommend_games = gr.Interface(
     description="Get a list of similar games based on a given game ID"
 )
 
+threading.Thread(target=_refresh_hot, daemon=True).start()
+
 bgg_tools = gr.TabbedInterface(
     [search_bgg, game_details, hot_games, recommend_games],
     ["Search", "Details", "Hot Games", "Recommend Games"]
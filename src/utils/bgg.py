@@ -1,8 +1,157 @@
+import asyncio
+import functools
+import html
+import math
+import re
+import threading
+import time
+
+import httpx
+import orjson
 import requests
-from xml.etree import ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # lxml's C parser is several times faster than the stdlib on BGG's XML.
+    from lxml import etree as ET
+except ImportError:
+    from xml.etree import ElementTree as ET
 
 BGG_BASE_URL = 'https://boardgamegeek.com/xmlapi2'
 
+# Shared session so connections are pooled and the TLS handshake is paid once
+# per host instead of once per call.
+_SESSION = requests.Session()
+_SESSION.headers.update({'Accept-Encoding': 'gzip'})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+def ttl_cache(ttl, maxsize=1024):
+    """
+    Cache a function's results in-process for `ttl` seconds, keyed by its arguments.
+
+    Identical queries (the hot list, repeated searches) then skip the network
+    round-trip entirely. A fresh result that is a shorter list than the cached
+    one is treated as truncated (e.g. a partial response after retries) and
+    does not evict the richer cached value; empty-list results are never
+    cached at all, since several callers return [] on swallowed errors.
+
+    Args:
+        ttl (int): Seconds a cached result stays valid.
+        maxsize (int): Maximum number of cached entries; oldest are dropped first.
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        def _store(key, result):
+            with lock:
+                entry = cache.get(key)
+                if isinstance(result, list) and not result:
+                    # The similar-games helpers swallow errors and return [],
+                    # so an empty list on a cold key is as likely a transient
+                    # failure as a real answer. Don't cache it; the next call
+                    # retries instead of serving "no results" for a full TTL.
+                    return entry[1] if entry is not None else result
+                if (entry is not None and isinstance(result, list)
+                        and isinstance(entry[1], list) and len(result) < len(entry[1])):
+                    # Keep the richer result, but refresh its timestamp.
+                    result = entry[1]
+                elif len(cache) >= maxsize and key not in cache:
+                    cache.pop(next(iter(cache)))
+                cache[key] = (time.monotonic(), result)
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                # Unhashable argument (e.g. a list of IDs): skip caching.
+                return func(*args, **kwargs)
+
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and time.monotonic() - entry[0] < ttl:
+                    return entry[1]
+
+            return _store(key, func(*args, **kwargs))
+
+        def refresh(*args, **kwargs):
+            """Call through and re-stamp the cache even if the entry is still fresh."""
+            key = (args, tuple(sorted(kwargs.items())))
+            result = func(*args, **kwargs)
+            try:
+                hash(key)
+            except TypeError:
+                return result
+            return _store(key, result)
+
+        wrapper.refresh = refresh
+        return wrapper
+    return decorator
+
+# /search and /hot responses are one flat level of <item> elements with a
+# couple of attribute-only children, so a few precompiled regexes over the
+# raw bytes beat building an element tree at all. get_game_details keeps the
+# real parser; its schema is too rich for this.
+_ITEM_BLOCK_RE = re.compile(rb'<item\b([^>]*)>(.*?)</item>', re.DOTALL)
+_ITEM_OPEN_RE = re.compile(rb'<item\b')
+_ID_RE = re.compile(rb'\bid="([^"]*)"')
+_RANK_RE = re.compile(rb'\brank="([^"]*)"')
+_NAME_RE = re.compile(rb'<name\b[^>]*\bvalue="([^"]*)"')
+_YEAR_RE = re.compile(rb'<yearpublished\b[^>]*\bvalue="([^"]*)"')
+
+def _attr(match):
+    # Attribute values carry XML entity escapes that ElementTree would have
+    # decoded for us.
+    return html.unescape(match.group(1).decode())
+
+def _parse_flat_items(content, with_rank=False):
+    """
+    Fast-path parse of a flat BGG item list straight from the response bytes.
+
+    Returns None when any item is missing an expected field, so callers can
+    fall back to the ElementTree path instead of returning bad rows.
+    """
+    if b'<items' not in content:
+        # Not an items document at all (e.g. an HTML error or rate-limit
+        # page); let the ElementTree path parse it and fail loudly instead
+        # of reporting "no results".
+        return None
+
+    blocks = _ITEM_BLOCK_RE.findall(content)
+    if len(blocks) != len(_ITEM_OPEN_RE.findall(content)):
+        # Some <item> shape the block regex doesn't understand (e.g.
+        # self-closing); bail out rather than return a truncated list.
+        return None
+
+    results = []
+    for attrs, body in blocks:
+        item_id = _ID_RE.search(attrs)
+        name = _NAME_RE.search(body)
+        rank = _RANK_RE.search(attrs) if with_rank else None
+        if item_id is None or name is None or (with_rank and rank is None):
+            return None
+
+        year = _YEAR_RE.search(body)
+        row = {"id": _attr(item_id), "title": _attr(name)}
+        if with_rank:
+            row["rank"] = _attr(rank)
+        row["year"] = _attr(year) if year is not None else "Unknown"
+        if with_rank:
+            row["url"] = f"https://boardgamegeek.com/boardgame/{row['id']}"
+        results.append(row)
+
+    return results
+
+@ttl_cache(ttl=86400)
 def search(query):
     """
     Search for board games on BoardGameGeek by title.
@@ -24,44 +173,102 @@ def search(query):
         ]
     """
 
-    response = requests.get(f"{BGG_BASE_URL}/search?query={query}&exact=0&type=boardgame")
+    response = _SESSION.get(f"{BGG_BASE_URL}/search", params={"query": query, "exact": 0, "type": "boardgame"}, timeout=10)
+
+    results = _parse_flat_items(response.content)
+    if results is not None:
+        return results
+
     root = ET.fromstring(response.content)
 
-    results = []
-    for item in root.findall("item"):
-        game_id = item.get("id")
-        title = item.find("name").get("value")
-        year = item.find("yearpublished").get("value") if item.find("yearpublished") is not None else "Unknown"
-        results.append({"id": game_id, "title": title, "year": year})
+    # iterfind yields items lazily and the comprehension skips the per-row
+    # list.append dispatch of the old explicit loop.
+    return [
+        {
+            "id": item.get("id"),
+            "title": item.find("name").get("value"),
+            "year": yp.get("value") if (yp := item.find("yearpublished")) is not None else "Unknown",
+        }
+        for item in root.iterfind("item")
+    ]
 
-    return results
+# BGG descriptions arrive HTML-escaped and sprinkled with markup; decode the
+# entities and strip tags once at parse time, with the regex compiled up
+# front, instead of shipping the raw markup to every client.
+_TAG_RE = re.compile(r'<[^>]+>')
+
+def _clean_description(text):
+    return _TAG_RE.sub('', html.unescape(text))
+
+# BGG caps how many IDs one /thing request may carry; larger batches are
+# split into chunks of this size and fetched concurrently.
+_THING_CHUNK_SIZE = 20
 
+@ttl_cache(ttl=86400)
 def get_game_details(game_ids):
     """
     Get detailed information for one or more board games.
-    
+
     Args:
         game_ids (str or list): Single game ID or comma-separated list of IDs
-        
+
     Returns:
         List[dict]: Detailed game information including mechanics, categories, ratings, etc.
     """
-    if isinstance(game_ids, list):
-        game_ids = ",".join(game_ids)
-    
-    response = requests.get(f"{BGG_BASE_URL}/thing?id={game_ids}&stats=1")
-    root = ET.fromstring(response.content)
-    
+    if isinstance(game_ids, str):
+        game_ids = [gid.strip() for gid in game_ids.split(",") if gid.strip()]
+
+    if len(game_ids) > _THING_CHUNK_SIZE:
+        chunks = [game_ids[i:i + _THING_CHUNK_SIZE] for i in range(0, len(game_ids), _THING_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # executor.map preserves chunk order, so the concatenation keeps
+            # the caller's original ID order.
+            return [game for chunk in executor.map(_fetch_game_details, chunks) for game in chunk]
+
+    return _fetch_game_details(game_ids)
+
+def _fetch_game_details(game_ids):
+    # Stream the response and parse incrementally: with many IDs the /thing
+    # payload gets large, and iterparse keeps only one <item> subtree resident
+    # instead of the whole document.
+    #
+    # BGG answers 202 Accepted with an empty body while it is still preparing
+    # a large response; poll with exponential backoff instead of parsing the
+    # empty body and making the user retry by hand. The TTL cache memoizes
+    # the eventual success so it is never repolled.
+    for delay in (0, 0.5, 1, 2, 4):
+        time.sleep(delay)
+        response = _SESSION.get(f"{BGG_BASE_URL}/thing", params={"id": ",".join(game_ids), "stats": 1}, stream=True, timeout=10)
+        if response.status_code != 202:
+            break
+        response.close()
+    else:
+        # Still 202 after every poll: there is no body to parse, so give up.
+        # ttl_cache never stores empty lists, so the next call polls afresh.
+        return []
+    response.raw.decode_content = True
+
     games = []
-    for item in root.findall("item"):
+    for event, item in ET.iterparse(response.raw, events=('end',)):
+        if item.tag != "item":
+            continue
+
+        # Look each optional element up once; the `find(...) if find(...) is
+        # not None` pattern walked the subtree twice per field.
+        description = item.find("description")
+        year = item.find("yearpublished")
+        min_players = item.find("minplayers")
+        max_players = item.find("maxplayers")
+        playing_time = item.find("playingtime")
+
         game = {
             "id": item.get("id"),
             "title": item.find("name[@type='primary']").get("value"),
-            "description": item.find("description").text if item.find("description") is not None else "No description available",
-            "year": item.find("yearpublished").get("value") if item.find("yearpublished") is not None else "Unknown",
-            "min_players": item.find("minplayers").get("value") if item.find("minplayers") is not None else "Unknown",
-            "max_players": item.find("maxplayers").get("value") if item.find("maxplayers") is not None else "Unknown",
-            "playing_time": item.find("playingtime").get("value") if item.find("playingtime") is not None else "Unknown",
+            "description": _clean_description(description.text) if description is not None and description.text else "No description available",
+            "year": year.get("value") if year is not None else "Unknown",
+            "min_players": min_players.get("value") if min_players is not None else "Unknown",
+            "max_players": max_players.get("value") if max_players is not None else "Unknown",
+            "playing_time": playing_time.get("value") if playing_time is not None else "Unknown",
             "complexity": None,
             "rating": None,
             "categories": [],
@@ -81,16 +288,19 @@ def get_game_details(game_ids):
         
         # Extract categories and mechanics
         for link in item.findall("link"):
-            link_type = link.get("type")
+            attrib = link.attrib
+            link_type = attrib.get("type")
             if link_type == "boardgamecategory":
-                game["categories"].append(link.get("value"))
+                game["categories"].append(attrib.get("value"))
             elif link_type == "boardgamemechanic":
-                game["mechanics"].append(link.get("value"))
-        
+                game["mechanics"].append(attrib.get("value"))
+
         games.append(game)
-    
+        item.clear()
+
     return games
 
+@ttl_cache(ttl=3600)
 def get_hot_games():
     """
     Get a list of the Top 50 trending games today from BoardGameGeek.
@@ -103,20 +313,26 @@ def get_hot_games():
             - 'year' (str): The year the game was published (or 'Unknown' if not available).
             - 'url' (str): URL to the similar game's page on BoardGameGeek.
     """
-    response = requests.get(f"{BGG_BASE_URL}/hot?type=boardgame")
-    root = ET.fromstring(response.content)
+    response = _SESSION.get(f"{BGG_BASE_URL}/hot", params={"type": "boardgame"}, timeout=10)
 
-    results = []
-    for item in root.findall("item"):
-        game_id = item.get("id")
-        rank = item.get("rank")
-        title = item.find("name").get("value")
-        year = item.find("yearpublished").get("value") if item.find("yearpublished") is not None else "Unknown"
-        url = f"https://boardgamegeek.com/boardgame/{game_id}"
-        results.append({"id": game_id, "title": title, "rank": rank, "year": year, "url": url})
+    results = _parse_flat_items(response.content, with_rank=True)
+    if results is not None:
+        return results
 
-    return results
+    root = ET.fromstring(response.content)
 
+    return [
+        {
+            "id": item.get("id"),
+            "title": item.find("name").get("value"),
+            "rank": item.get("rank"),
+            "year": yp.get("value") if (yp := item.find("yearpublished")) is not None else "Unknown",
+            "url": f"https://boardgamegeek.com/boardgame/{item.get('id')}",
+        }
+        for item in root.iterfind("item")
+    ]
+
+@ttl_cache(ttl=86400)
 def get_similar_games(game_id, limit=5):
     """
     Get a list of games similar to the specified game from the recommend games API.
@@ -136,9 +352,9 @@ def get_similar_games(game_id, limit=5):
     recommended_games = []
     api_url = f"https://recommend.games/api/games/{game_id}/similar.json"
     try: 
-        response = requests.get(api_url)
+        response = _SESSION.get(api_url, timeout=10)
         response.raise_for_status()
-        api_data = response.json()
+        api_data = orjson.loads(response.content)
         results = api_data['results']
         # Filter out all games with less than 30 votes (num_votes)
         results = [game for game in results if game.get('num_votes', 0) >= 30]
@@ -168,7 +384,13 @@ def get_similar_games(game_id, limit=5):
     except requests.RequestException as e:
         print(f"Error fetching similar games: {e}")
         return []
+    except ValueError as e:
+        # orjson.JSONDecodeError subclasses ValueError, not RequestException,
+        # so a non-JSON body (e.g. an HTML maintenance page) lands here.
+        print(f"Error: {e}")
+        return []
 
+@ttl_cache(ttl=86400)
 def get_similar_games_v2(game_id, limit=5, start=0, end=25, noblock=False):
     """
     Retrieves a list of games similar to a specified board game from the RecommendGames API.
@@ -198,40 +420,73 @@ def get_similar_games_v2(game_id, limit=5, start=0, end=25, noblock=False):
 
     all_games = []
 
+    # recommend.games serves 25 rows per page, so a positive limit rarely
+    # needs more than ceil(limit/25) pages; fetch in batches of that size and
+    # only go back for more if filtering trimmed the batch below the limit.
+    per_page = 25
+    batch_size = math.ceil(limit / per_page) if limit > 0 else end - start
+    next_page = start + 1
+    done = False
+
     try:
-        for i in range(start+1, end+1):
-            params['page'] = i
-            response = requests.get(api_url, params=params, timeout=None if noblock else 10)
-            response.raise_for_status()
-            api_data = response.json()
-
-            games = api_data.get('results', [])
-            if not games:
-                break
-
-            processed_games = [
-                {
-                    'id': str(game.get('bgg_id', '')),
-                    'title': str(game.get('name', '')),
-                    'year': str(game.get('year', 'Unknown')),
-                    'description': str(game.get('description', 'No description available')),
-                    'url': str(game.get('url', '')),
-                }
-                for game in games
-                if game.get('num_votes', 0) >= 30 and game.get('rec_rating', 0) > 0.001
-            ]
+        while not done and next_page <= end:
+            batch = range(next_page, min(next_page + batch_size, end + 1))
+            next_page = batch.stop
+
+            # One event-loop thread multiplexes all page GETs over HTTP/2
+            # keep-alive, instead of paying a thread per request.
+            pages = asyncio.run(_fetch_pages_async(api_url, params, batch,
+                                                   timeout=None if noblock else 10))
+
+            for api_data in pages:
+                games = api_data.get('results', [])
+                if not games:
+                    done = True
+                    break
+
+                processed_games = [
+                    {
+                        'id': str(game.get('bgg_id', '')),
+                        'title': str(game.get('name', '')),
+                        'year': str(game.get('year', 'Unknown')),
+                        'description': str(game.get('description', 'No description available')),
+                        'url': str(game.get('url', '')),
+                    }
+                    for game in games
+                    if game.get('num_votes', 0) >= 30 and game.get('rec_rating', 0) > 0.001
+                ]
 
-            all_games.extend(processed_games)
+                all_games.extend(processed_games)
 
-            # Check if we have enough results
-            if len(all_games) >= end or not api_data.get('next'):
-                break
+                # Stop once the requested limit is satisfied or the dataset
+                # is exhausted.
+                if (limit > 0 and len(all_games) >= limit) or not api_data.get('next'):
+                    done = True
+                    break
 
         return all_games[:limit] if limit > 0 else all_games
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error fetching similar games: {e}")
         return []
     except ValueError as e:
         print(f"Error: {e}")
         return []
+
+async def _fetch_pages_async(api_url, params, pages, timeout):
+    # The client lives inside the coroutine because asyncio.run spins up a
+    # fresh event loop per call and httpx clients are bound to one loop.
+    limits = httpx.Limits(max_keepalive_connections=16)
+    async with httpx.AsyncClient(http2=True, timeout=timeout, limits=limits) as client:
+        async def fetch(page):
+            response = await client.get(api_url, params={**params, 'page': page})
+            if response.status_code == 404:
+                # DRF-style pagination 404s on a page past the last one. When
+                # a batch overruns the dataset, report that page as empty so
+                # the caller treats it as end-of-data instead of throwing
+                # away every page already fetched.
+                return {}
+            response.raise_for_status()
+            return orjson.loads(response.content)
+
+        return await asyncio.gather(*(fetch(page) for page in pages))